@@ -15,10 +15,39 @@
   - Marker is rendered from icon_marker.svg and drawn as a QgsMapCanvasItem
 ***************************************************************************/
 """
+import configparser
+import hashlib
 import os
-import duckdb
+import shutil
+import time
+from functools import lru_cache
+from importlib.util import find_spec
 
-from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication, Qt
+import duckdb
+import numpy as np
+
+try:
+    import h3  # optional: hash index for off-grid nearest-centre lookups
+    if not hasattr(h3, "latlng_to_cell"):  # h3 < 4 (geo_to_h3 / k_ring API)
+        h3 = None
+except ImportError:
+    h3 = None
+
+# Optional: on-disk query cache. Imported on first use, on the worker thread.
+HAVE_ARROW = find_spec("pyarrow") is not None
+
+from qgis.PyQt.QtCore import (
+    QSettings,
+    QTranslator,
+    QCoreApplication,
+    Qt,
+    QThreadPool,
+    QTimer,
+    QStandardPaths,
+    QPointF,
+    QRectF,
+    QSizeF,
+)
 from qgis.PyQt.QtGui import QIcon, QPixmap, QPainter
 from qgis.PyQt.QtWidgets import QAction, QFileDialog
 from qgis.PyQt.QtSvg import QSvgRenderer
@@ -37,19 +66,16 @@ from .resources import *  # noqa: F401,F403
 
 from .duckdb_click_plot_dockwidget import DuckDBClickPlotDockWidget
 from .click_tool import ClickTool
-from .duckdb_queries import find_nearest_point, query_timeseries
-
-
-# ---------------------------------------------------------------------
-# Hard-coded top sectors per substance (KISS / reproducible)
-# ---------------------------------------------------------------------
+from .query_worker import QueryWorker
+from .duckdb_queries import (
+    TOP_SECTORS_BY_SUBSTANCE,
+    NearestQuery,
+    PreparedQueries,
+    create_totals_table,
+    load_grid_centres,
+    missing_derived_objects,
+)
 
-TOP_SECTORS_BY_SUBSTANCE = {
-    "CH4": ["ENF", "PRO_FFF", "PRO_COAL", "MNM", "SWD_LDF", "PRO_GAS", "WWT", "PRO_OIL"],
-    "CO2": ["ENE", "TRO", "IND", "REF_TRF", "RCO", "NMM", "TNR_Aviation_CRS", "TNR_Other"],
-    "CO2bio": ["IND", "AWB", "ENE", "PRO_FFF", "TRO", "SWD_INC", "TNR_Aviation_CRS", "TNR_Aviation_CDS"],
-    "N2O": ["AGS", "IDE", "N2O", "CHE", "ENE", "RCO", "REF_TRF", "IND"],
-}
 
 # Labels for dropdown display ("CODE - Name")
 SECTOR_LABELS = {
@@ -83,6 +109,23 @@ SECTOR_LABELS = {
 }
 
 
+# Regular emissions grid: 0.1° cells with edges on multiples of 0.1°
+# from (-90, -180), i.e. centres at ... 0.05, 0.15, 0.25, ...
+GRID_RES = 0.1
+GRID_ORIGIN_LAT = -90.0
+GRID_ORIGIN_LON = -180.0
+
+# H3 resolution for the optional nearest-centre hash index. Res 5 cells
+# (~250 km²) hold about two 0.1° centres each, so a ring-1 disk around the
+# click always has candidates near the grid edge.
+H3_RESOLUTION = 5
+
+
+# Timeseries results cached on disk are reused for up to a year; the
+# cache path includes the plugin version and the DB file identity.
+DISK_CACHE_MAX_AGE_S = 365 * 24 * 3600
+
+
 # ---------------------------------------------------------------------
 # Canvas marker (SVG rendered to pixmap)
 # ---------------------------------------------------------------------
@@ -96,31 +139,63 @@ class CanvasIconMarker(QgsMapCanvasItem):
         self._point = None  # QgsPointXY in map CRS of the canvas item
         self.setZValue(1000)
 
+        # Item origin sits on the point; the anchor (tip at centre-x, bottom-y)
+        # is baked into a fixed local offset, so paint() does no arithmetic.
+        w, h = pixmap.width(), pixmap.height()
+        self._offset = QPointF(-w / 2, -h)
+        self._rect = QRectF(self._offset, QSizeF(w, h))
+
     def setPoint(self, point: QgsPointXY):
         self._point = point
-        self.update()  # schedules repaint of this canvas item
+        self.updatePosition()
+
+    def updatePosition(self):
+        # Called by the canvas after pan/zoom; Qt repaints old and new areas
+        if self._point is not None:
+            self.setPos(self.toCanvasCoordinates(self._point))
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
 
     def paint(self, painter: QPainter, option, widget):
-        if self._point is None or self._pixmap is None or self._pixmap.isNull():
+        if self._point is None or self._pixmap.isNull():
             return
+        painter.drawPixmap(self._offset, self._pixmap)
+
+
+def snap_to_grid(lat, lon, res=GRID_RES, origin_lat=GRID_ORIGIN_LAT, origin_lon=GRID_ORIGIN_LON):
+    """
+    Snap to the centre of the regular grid cell containing (lat, lon).
+
+    Pure arithmetic, no database access. Cell edges lie at
+    origin + k·res, so centres lie at origin + (k + ½)·res.
+    Accepts scalars or NumPy arrays (elementwise).
+    """
+    lat_c = np.floor((np.asarray(lat) - origin_lat) / res) * res + origin_lat + res / 2
+    lon_c = np.floor((np.asarray(lon) - origin_lon) / res) * res + origin_lon + res / 2
+    return lat_c, lon_c
 
-        # Convert map coords to canvas pixel coords
-        p = self.toCanvasCoordinates(self._point)
 
-        # Place marker with tip at location: centre-x, bottom-y
-        x = int(p.x() - self._pixmap.width() / 2)
-        y = int(p.y() - self._pixmap.height())
-        painter.drawPixmap(x, y, self._pixmap)
+# Rendered marker pixmaps keyed by (svg_path, size_px); survives dock reopen
+_PIXMAP_CACHE = {}
 
 
 def render_svg_to_pixmap(svg_path: str, size_px: int) -> QPixmap:
-    """Render an SVG to a transparent QPixmap."""
+    """Render an SVG to a transparent QPixmap (cached per path and size)."""
+    key = (svg_path, size_px)
+    pm = _PIXMAP_CACHE.get(key)
+    if pm is not None:
+        return pm
+
     pm = QPixmap(size_px, size_px)
     pm.fill(Qt.transparent)
     renderer = QSvgRenderer(svg_path)
     painter = QPainter(pm)
     renderer.render(painter)
     painter.end()
+
+    if not pm.isNull():
+        _PIXMAP_CACHE[key] = pm
     return pm
 
 
@@ -132,6 +207,19 @@ class DuckDBClickPlot:
     """QGIS plugin implementation class (instantiated by __init__.py classFactory)."""
 
     SETTINGS_KEY_DB_PATH = "duckdb_click_plot/db_path"
+    SETTINGS_KEY_THREADS = "duckdb_click_plot/threads"
+    SETTINGS_KEY_MEMORY_LIMIT = "duckdb_click_plot/memory_limit"
+    SETTINGS_KEY_PREPARE_DB = "duckdb_click_plot/prepare_database"
+    SETTINGS_KEY_USE_CELL_ID = "duckdb_click_plot/use_cell_id"
+
+    # How long unload waits for a running worker before leaving it to finish
+    UNLOAD_WAIT_MS = 2000
+
+    # Info label text (plain text; the label does not parse HTML)
+    _INFO_TMPL = (
+        "Clicked (WGS84): {lat:.5f}, {lon:.5f}\n"
+        "Substance: {substance}, {sector}, {value}"
+    )
 
     def __init__(self, iface):
         self.iface = iface
@@ -145,6 +233,8 @@ class DuckDBClickPlot:
             self.translator.load(locale_path)
             QCoreApplication.installTranslator(self.translator)
 
+        self.plugin_version = self._read_plugin_version()
+
         # UI plumbing
         self.actions = []
         self.menu = self.tr("&DuckDB Click Plot")
@@ -159,18 +249,59 @@ class DuckDBClickPlot:
         # DuckDB
         self.con = None
         self.DB_PATH = None
+        self._con_queries = None  # NearestQuery bound to con (UI thread)
+
+        # Timeseries queries run off the UI thread on a dedicated cursor.
+        # One pool thread => queries are serialised and the cursor is never shared.
+        self._worker_con = None
+        self._queries = None  # PreparedQueries bound to _worker_con
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+        self._click_seq = 0  # bumped per request; stale results are dropped
+        self._preparing = False  # opt-in RW preparation running on the pool
+        self._prepare_con = None  # its RW connection, interrupted on unload
+        self._cancel_prepare = False
+
+        # Memoised _query_uncached, one per connection (see connect_db)
+        self._query_cached = None
+
+        # Parquet cache of query results across sessions (None => disabled)
+        self._disk_cache_dir = None
+
+        # Debounce rapid sector changes into a single replot
+        self._replot_timer = QTimer()
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(50)
+        self._replot_timer.timeout.connect(self.replot_last)
+
+        # Grid centres present in the DB, keyed by rounded (lat, lon);
+        # values are the exact stored coordinates used in queries
+        self._centres = {}
+        # Same centres as parallel contiguous arrays for nearest-centre search
+        self._lat_arr = np.empty(0)
+        self._lon_arr = np.empty(0)
+        # Optional H3 cell -> [(lat, lon), ...] index (only if h3 is installed)
+        self._h3_index = {}
+        # Centres are loaded on the worker pool after connecting
+        self._centres_loading = False
+        self._centres_seq = 0  # bumped per load/disconnect; stale loads are dropped
+
+        # Map CRS -> WGS84 transform, rebuilt lazily after canvas CRS changes
+        self._wgs84 = QgsCoordinateReferenceSystem("EPSG:4326")
+        self._xform = None
 
         # Query state
         self.substance = "CH4"
         self.sector = None  # None => All sectors mode (TOTALS preferred)
         self.last_grid_point = None  # (grid_lat, grid_lon)
         self._last_click_latlon = None  # (clicked_lat, clicked_lon) for info label
+        self._last_query_key = None  # (grid point, substance, sector) last requested
 
         # Marker state
         self.marker_item = None
         self.marker_pixmap = None
 
-        # One-time warning flag (only relevant when spatial unavailable)
+        # One-time warning flag (click matched no centre, even via spatial)
         self._warned_math_snap_miss = False
 
         # One-time init guards
@@ -181,6 +312,15 @@ class DuckDBClickPlot:
     # Boilerplate / UI helpers
     # -------------------------
 
+    def _read_plugin_version(self) -> str:
+        """Plugin version from metadata.txt ("0" if unreadable)."""
+        parser = configparser.ConfigParser()
+        try:
+            parser.read(os.path.join(self.plugin_dir, "metadata.txt"), encoding="utf-8")
+            return parser.get("general", "version", fallback="0")
+        except Exception:
+            return "0"
+
     def tr(self, message):
         return QCoreApplication.translate("DuckDBClickPlot", message)
 
@@ -204,18 +344,23 @@ class DuckDBClickPlot:
 
         self.clear_marker()
 
-        if self.con is not None:
+        if self.click_tool is not None:
             try:
-                self.con.close()
+                self.iface.mapCanvas().destinationCrsChanged.disconnect(self._invalidate_xform)
             except Exception:
                 pass
-            self.con = None
+
+        self._replot_timer.stop()
+        self.disconnect_db()
 
         self.dockwidget = None
         self.pluginIsActive = False
         
     def onClosePlugin(self):
-        # Dockwidget closed by user
+        # Dockwidget closed by user.
+        # The DuckDB connection is deliberately kept open (see disconnect_db):
+        # reopening the dock then reuses the warm buffer pool, prepared
+        # statements, centre lookup and query cache instead of reconnecting.
         try:
             if self.dockwidget is not None:
                 self.dockwidget.closingPlugin.disconnect(self.onClosePlugin)
@@ -266,21 +411,200 @@ class DuckDBClickPlot:
         except Exception:
             return False
 
-    @staticmethod
-    def snap_center_0p1(x: float) -> float:
-        """Snap to 0.1° grid centres with 0.05° offset."""
-        return round((x - 0.05) * 10.0) / 10.0 + 0.05
+    def disconnect_db(self):
+        """
+        Release the DuckDB connection and everything derived from it.
+
+        Only called from unload(); closing the dock keeps the connection.
+        The next run() reconnects from scratch.
+
+        A running database preparation is interrupted rather than awaited.
+        If a worker is still busy after UNLOAD_WAIT_MS, its connections are
+        dropped without closing; the worker keeps its own reference and
+        DuckDB closes them once it finishes.
+        """
+        self._cancel_prepare = True
+        rw = self._prepare_con
+        if rw is not None:
+            try:
+                rw.interrupt()
+            except Exception:
+                pass
+        idle = self._pool.waitForDone(self.UNLOAD_WAIT_MS)
+        self._query_cached = None
+        self._last_query_key = None
+
+        self._queries = None
+        self._con_queries = None
+        if not idle:
+            self._worker_con = None
+            self.con = None
+        if self._worker_con is not None:
+            try:
+                self._worker_con.close()
+            except Exception:
+                pass
+            self._worker_con = None
+
+        if self.con is not None:
+            try:
+                self.con.close()
+            except Exception:
+                pass
+            self.con = None
 
-    def point_exists(self, lat: float, lon: float) -> bool:
-        """Cheap existence test for snapped point when spatial not available."""
+        self._centres = {}
+        self._lat_arr = np.empty(0)
+        self._lon_arr = np.empty(0)
+        self._h3_index = {}
+        self._centres_loading = False
+        self._centres_seq += 1
+        self._disk_cache_dir = None
+
+    def duckdb_config(self, read_only: bool = True) -> dict:
+        """
+        Connection config for a desktop session (overridable via QSettings).
+
+        DuckDB defaults to one thread per core, which competes with QGIS's
+        own render threads; per-click queries are tiny and need few.
+        Insertion order is irrelevant because every query has ORDER BY.
+        Read-only connections also pin access_mode, so several QGIS
+        instances can share one file without write locks.
+        """
+        settings = QSettings()
+        config = {
+            "threads": str(settings.value(self.SETTINGS_KEY_THREADS, 4, type=int)),
+            "memory_limit": settings.value(self.SETTINGS_KEY_MEMORY_LIMIT, "2GB", type=str),
+            "preserve_insertion_order": "false",
+        }
+        if read_only:
+            config["access_mode"] = "read_only"
+        return config
+
+    def connect_read_only(self):
+        """Open the plugin's (only long-lived) connection, always read-only."""
+        return duckdb.connect(self.DB_PATH, read_only=True, config=self.duckdb_config())
+
+    def prepare_database(self):
+        """
+        Build the optional derived tables once, via a short-lived RW connection.
+
+        Opt-in (prepare_database setting, off by default); the supported
+        path is building them from a script (see README). Runs on the
+        worker pool, never the UI thread, and touches no Qt widgets.
+
+        Must run before the read-only connection is opened (DuckDB will not
+        open the same file twice in one process with different modes).
+        Any failure (file locked by another process, read-only file) is
+        ignored: queries still work without them.
+
+        The write lock is only taken if a read-only probe finds something
+        missing. Unloading the plugin interrupts the build (see
+        disconnect_db); the unfinished table is rolled back and rebuilt on
+        the next run.
+        """
         try:
-            row = self.con.execute(
-                "SELECT 1 FROM emissions WHERE lat = ? AND lon = ? LIMIT 1;",
-                [lat, lon],
-            ).fetchone()
-            return row is not None
+            probe = self.connect_read_only()
+            try:
+                if not missing_derived_objects(probe):
+                    return
+            finally:
+                probe.close()
         except Exception:
-            return False
+            pass
+
+        try:
+            rw = duckdb.connect(self.DB_PATH, read_only=False, config=self.duckdb_config(read_only=False))
+        except Exception:
+            return
+
+        # Published before the flag check, so disconnect_db either sees the
+        # connection (and interrupts it) or we see the flag.
+        self._prepare_con = rw
+        try:
+            if self._cancel_prepare:
+                return
+            try:
+                create_totals_table(rw, TOP_SECTORS_BY_SUBSTANCE)
+            except Exception:
+                pass
+        finally:
+            self._prepare_con = None
+            rw.close()
+
+    @staticmethod
+    def _centre_key(lat: float, lon: float):
+        """Hashable key for a grid centre, tolerant of float round-off."""
+        return (round(lat, 6), round(lon, 6))
+
+    def load_centres(self):
+        """
+        Load all grid centres in memory (once per connection), off the UI thread.
+
+        The full-table DISTINCT scan and the H3 build run on the worker pool;
+        _on_centres_ready installs the result. Until then clicks use the
+        fallbacks in handle_click.
+        """
+        self._centres_loading = True
+        self._centres_seq += 1
+        worker = QueryWorker(self._centres_seq, self._read_centres, self._worker_con)
+        worker.signals.finished.connect(self._on_centres_ready)
+        worker.signals.failed.connect(self._on_centres_failed)
+        self._pool.start(worker)
+
+    @classmethod
+    def _read_centres(cls, con):
+        """Worker side of load_centres: (lat_arr, lon_arr, centres, h3_index)."""
+        lats, lons = load_grid_centres(con)
+        lat_arr = np.ascontiguousarray(lats, dtype=np.float64)
+        lon_arr = np.ascontiguousarray(lons, dtype=np.float64)
+        centres = {
+            cls._centre_key(lat, lon): (lat, lon)
+            for lat, lon in zip(lat_arr.tolist(), lon_arr.tolist())
+        }
+
+        h3_index = {}
+        if h3 is not None:
+            for centre in centres.values():
+                cell = h3.latlng_to_cell(centre[0], centre[1], H3_RESOLUTION)
+                h3_index.setdefault(cell, []).append(centre)
+        return lat_arr, lon_arr, centres, h3_index
+
+    def _on_centres_ready(self, seq, result):
+        """Centres loaded (UI thread) -> install them, unless the connection changed."""
+        if seq != self._centres_seq:
+            return
+        self._centres_loading = False
+        self._lat_arr, self._lon_arr, self._centres, self._h3_index = result
+
+    def _on_centres_failed(self, seq, _message):
+        """Centre load failed -> keep the fallbacks (warned about on first click)."""
+        if seq == self._centres_seq:
+            self._centres_loading = False
+
+    def centre_for(self, lat: float, lon: float):
+        """Return the stored (lat, lon) for a snapped centre, or None if absent."""
+        return self._centres.get(self._centre_key(lat, lon))
+
+    def _nearest_h3(self, lat: float, lon: float):
+        """Nearest centre among the click's H3 cell and its ring-1 neighbours, or None."""
+        if not self._h3_index:
+            return None
+        cell = h3.latlng_to_cell(lat, lon, H3_RESOLUTION)
+        candidates = []
+        for c in h3.grid_disk(cell, 1):
+            candidates.extend(self._h3_index.get(c, ()))
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: (c[0] - lat) ** 2 + (c[1] - lon) ** 2)
+
+    def _nearest_np(self, lat: float, lon: float):
+        """Nearest cached centre by squared lat/lon distance, or None if none loaded."""
+        if self._lat_arr.size == 0:
+            return None
+        d2 = (self._lat_arr - lat) ** 2 + (self._lon_arr - lon) ** 2
+        i = int(np.argmin(d2))
+        return float(self._lat_arr[i]), float(self._lon_arr[i])
 
     # -------------------------
     # Marker handling
@@ -307,8 +631,9 @@ class DuckDBClickPlot:
         self.ensure_marker_loaded()
         if self.marker_item is None:
             return
+        # setPoint() schedules a repaint of the marker's own rect only;
+        # a full canvas refresh would re-render every layer.
         self.marker_item.setPoint(QgsPointXY(lon, lat))
-        self.iface.mapCanvas().refresh()
 
     def clear_marker(self):
         """Remove marker so it doesn't persist across reloads."""
@@ -319,12 +644,9 @@ class DuckDBClickPlot:
         except Exception:
             pass
         finally:
+            # hide() already repaints the area the marker covered
             self.marker_item = None
             self.marker_pixmap = None
-            try:
-                self.iface.mapCanvas().refresh()
-            except Exception:
-                pass
 
     # -------------------------
     # Main run + handlers
@@ -346,6 +668,7 @@ class DuckDBClickPlot:
         if self.click_tool is None:
             self.click_tool = ClickTool(self.iface.mapCanvas())
             self.click_tool.clicked.connect(self.handle_click)
+            self.iface.mapCanvas().destinationCrsChanged.connect(self._invalidate_xform)
 
         self.iface.mapCanvas().setMapTool(self.click_tool)
 
@@ -355,9 +678,20 @@ class DuckDBClickPlot:
                 self.dockwidget.info_label.setText("No database selected.")
                 return
 
-            self.con = duckdb.connect(self.DB_PATH, read_only=True)
-            self.ensure_spatial_loaded()
-            self.dockwidget.info_label.setText(f"DB: {self.DB_PATH}\nClick the map…")
+            if QSettings().value(self.SETTINGS_KEY_PREPARE_DB, False, type=bool):
+                if not self._preparing:
+                    # Connect once the (possibly long) RW build has finished
+                    self._preparing = True
+                    self._cancel_prepare = False
+                    self.dockwidget.info_label.setText(
+                        f"DB: {self.DB_PATH}\nPreparing database (one-off)…"
+                    )
+                    worker = QueryWorker(0, self.prepare_database)
+                    worker.signals.finished.connect(self._on_database_prepared)
+                    worker.signals.failed.connect(self._on_database_prepared)
+                    self._pool.start(worker)
+            else:
+                self.connect_db()
 
         # Dropdown init (once)
         if not self._dropdowns_initialized:
@@ -373,10 +707,39 @@ class DuckDBClickPlot:
 
         # Connect signals (once)
         if not self._signals_connected:
-            self.dockwidget.sector_combo.currentIndexChanged.connect(self.replot_last)
+            self.dockwidget.sector_combo.currentIndexChanged.connect(self._schedule_replot)
             self.dockwidget.substance_combo.currentIndexChanged.connect(self.handle_substance_change)
             self._signals_connected = True
 
+    def connect_db(self):
+        """Open the read-only connection and everything derived from it."""
+        self.con = self.connect_read_only()
+        self._worker_con = self.con.cursor()
+        self._queries = PreparedQueries(
+            self._worker_con,
+            TOP_SECTORS_BY_SUBSTANCE,
+            use_cell_ids=QSettings().value(self.SETTINGS_KEY_USE_CELL_ID, False, type=bool),
+        )
+        self._con_queries = NearestQuery(self.con)
+        self._disk_cache_dir = self._make_disk_cache_dir()
+        # Per instance and per connection: a class-level @lru_cache would be
+        # shared by every instance and keep them alive through `self`.
+        self._query_cached = lru_cache(maxsize=512)(self._query_uncached)
+        self.ensure_spatial_loaded()
+        self.load_centres()
+        self.dockwidget.info_label.setText(f"DB: {self.DB_PATH}\nClick the map…")
+
+    def _on_database_prepared(self, _seq, _result):
+        """RW preparation finished (UI thread) -> connect, if still active."""
+        self._preparing = False
+        if not self.pluginIsActive or self.dockwidget is None or self.con is not None:
+            return
+        self.connect_db()
+
+    def _invalidate_xform(self):
+        """Canvas CRS changed -> rebuild the WGS84 transform on next click."""
+        self._xform = None
+
     def refresh_dropdowns_for_substance(self):
         """Update sector list for current substance."""
         self.substance = self.dockwidget.current_substance() or self.substance
@@ -388,6 +751,10 @@ class DuckDBClickPlot:
         self.refresh_dropdowns_for_substance()
         self.replot_last()
 
+    def _schedule_replot(self, *_):
+        """Sector changed -> replot once the selection settles (50 ms)."""
+        self._replot_timer.start()
+
     def replot_last(self):
         """Re-run query and redraw plot using last snapped grid point."""
         if self.con is None or self.dockwidget is None or self.last_grid_point is None:
@@ -397,52 +764,202 @@ class DuckDBClickPlot:
         self.substance = self.dockwidget.current_substance() or self.substance
         self.sector = self.dockwidget.current_sector()
 
-        df = query_timeseries(
-            self.con,
+        # Combo signals can fire without the selection actually changing
+        if (self.last_grid_point, self.substance, self.sector) == self._last_query_key:
+            return
+
+        self._request_timeseries(grid_lat, grid_lon)
+
+    def _make_disk_cache_dir(self):
+        """
+        Directory for Parquet-cached query results, or None if unavailable.
+
+        Laid out as <plugin version>/<DB path key>/<DB state key>, the state
+        key hashing the file's size and mtime, so a version bump or a rebuilt
+        database never serves stale series. Outdated entries are pruned here.
+        """
+        if not HAVE_ARROW:
+            return None
+
+        base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        if not base:
+            return None
+
+        try:
+            st = os.stat(self.DB_PATH)
+            db_key = hashlib.sha1(os.path.abspath(self.DB_PATH).encode("utf-8")).hexdigest()[:16]
+            state_key = hashlib.sha1(f"{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()[:16]
+            root = os.path.join(base, "DuckDBClickPlot")
+            path = os.path.join(root, self.plugin_version, db_key, state_key)
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            return None
+
+        self._prune_disk_cache(root, path)
+        return path
+
+    def _prune_disk_cache(self, root, current):
+        """
+        Remove cache entries that can never be served again.
+
+        Deletes other plugin versions' caches, earlier states of the current
+        database, and entries older than DISK_CACHE_MAX_AGE_S; empty folders
+        are removed too. Best-effort: errors are ignored.
+        """
+        version_dir = os.path.dirname(os.path.dirname(current))
+        db_dir = os.path.dirname(current)
+        now = time.time()
+        try:
+            for entry in os.scandir(root):
+                if entry.is_dir() and entry.path != version_dir:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+
+            for db_entry in os.scandir(version_dir):
+                if not db_entry.is_dir():
+                    continue
+                for state_entry in os.scandir(db_entry.path):
+                    if not state_entry.is_dir() or state_entry.path == current:
+                        continue
+                    if db_entry.path == db_dir:
+                        # Earlier size/mtime of the database in use
+                        shutil.rmtree(state_entry.path, ignore_errors=True)
+                        continue
+                    for f in os.scandir(state_entry.path):
+                        try:
+                            if now - f.stat().st_mtime >= DISK_CACHE_MAX_AGE_S:
+                                os.remove(f.path)
+                        except OSError:
+                            pass
+                    try:
+                        os.rmdir(state_entry.path)  # only if now empty
+                    except OSError:
+                        pass
+                if db_entry.path != db_dir:
+                    try:
+                        os.rmdir(db_entry.path)
+                    except OSError:
+                        pass
+
+            for f in os.scandir(current):
+                try:
+                    if now - f.stat().st_mtime >= DISK_CACHE_MAX_AGE_S:
+                        os.remove(f.path)
+                except OSError:
+                    pass
+        except OSError:
+            pass
+
+    def _query_uncached(self, grid_lat, grid_lon, substance, sector, top_sectors):
+        """
+        Timeseries query, memoised per connection as `_query_cached`
+        (sector toggles often revisit a cell).
+
+        Arguments must be hashable, so `top_sectors` is a tuple. The memo
+        is replaced whenever the connection changes; callers must not
+        mutate the result.
+        Misses are served from the on-disk Parquet cache when fresh, and
+        written back to it after querying DuckDB.
+        """
+        path = None
+        if self._disk_cache_dir is not None:
+            import pyarrow.parquet as pq
+
+            name = f"{substance}_{sector or 'ALL'}_{grid_lat!r}_{grid_lon!r}.parquet"
+            path = os.path.join(self._disk_cache_dir, name)
+            try:
+                if time.time() - os.path.getmtime(path) < DISK_CACHE_MAX_AGE_S:
+                    return pq.read_table(path)
+            except Exception:
+                pass
+
+        tbl = self._queries.timeseries(
             lat=grid_lat,
             lon=grid_lon,
-            substance=self.substance,
-            sector=self.sector,
-            top_sectors=TOP_SECTORS_BY_SUBSTANCE.get(self.substance, []),
+            substance=substance,
+            sector=sector,
+            top_sectors=list(top_sectors),
         )
 
+        if path is not None:
+            try:
+                tmp = path + ".tmp"
+                pq.write_table(tbl, tmp)
+                os.replace(tmp, path)
+            except Exception:
+                pass
+        return tbl
+
+    def _request_timeseries(self, grid_lat, grid_lon):
+        """Queue a timeseries query for the current selection on the worker thread."""
+        self._last_query_key = ((grid_lat, grid_lon), self.substance, self.sector)
+        self._click_seq += 1
+        worker = QueryWorker(
+            self._click_seq,
+            self._query_cached,
+            grid_lat,
+            grid_lon,
+            self.substance,
+            self.sector,
+            tuple(TOP_SECTORS_BY_SUBSTANCE.get(self.substance, [])),
+        )
+        worker.signals.finished.connect(self._on_timeseries_ready)
+        worker.signals.failed.connect(self._on_timeseries_failed)
+        self._pool.start(worker)
+
+    def _on_timeseries_ready(self, seq, df):
+        """Worker finished (UI thread) -> plot, unless a newer request was issued."""
+        if seq != self._click_seq or self.dockwidget is None:
+            return
         self._update_plot_and_info(df)
 
+    def _on_timeseries_failed(self, seq, message):
+        """Worker raised (UI thread) -> report it; the same selection can be retried."""
+        if seq != self._click_seq or self.dockwidget is None:
+            return
+        self._last_query_key = None
+        self.dockwidget.info_label.setText(f"Query failed: {message}")
+
     def handle_click(self, point):
         """Map click -> WGS84 transform -> snap -> query -> plot + marker + info."""
         if self.con is None or self.dockwidget is None:
             return
 
         # Transform clicked point to WGS84
-        canvas = self.iface.mapCanvas()
-        map_crs = canvas.mapSettings().destinationCrs()
-        wgs84 = QgsCoordinateReferenceSystem("EPSG:4326")
-        xform = QgsCoordinateTransform(map_crs, wgs84, QgsProject.instance())
-        pt = xform.transform(point)
+        if self._xform is None:
+            map_crs = self.iface.mapCanvas().mapSettings().destinationCrs()
+            self._xform = QgsCoordinateTransform(map_crs, self._wgs84, QgsProject.instance())
+        pt = self._xform.transform(point)
         lon, lat = pt.x(), pt.y()
 
         self._last_click_latlon = (lat, lon)
 
-        # Snap to nearest point (spatial) else grid-centre rounding
-        nearest = None
-        if self.ensure_spatial_loaded():
+        # Snap by grid-centre rounding; the in-memory centre lookup confirms
+        # the cell exists. Misses try the H3 index (if available), then a
+        # vectorised nearest-centre search, and spatial SQL only if no
+        # centres could be loaded.
+        snap_lat, snap_lon = (float(v) for v in snap_to_grid(lat, lon))
+        nearest = self.centre_for(snap_lat, snap_lon)
+        if nearest is None:
+            nearest = self._nearest_h3(lat, lon)
+        if nearest is None:
+            nearest = self._nearest_np(lat, lon)
+        if nearest is None and self.ensure_spatial_loaded():
             try:
-                nearest = find_nearest_point(self.con, lon, lat)
+                nearest = self._con_queries.nearest(lon, lat)
             except Exception:
                 nearest = None
 
         if nearest is not None:
             grid_lat, grid_lon = nearest
         else:
-            grid_lat = self.snap_center_0p1(lat)
-            grid_lon = self.snap_center_0p1(lon)
+            grid_lat, grid_lon = snap_lat, snap_lon
 
-            # Warn once if the rounded node doesn't exist (edge cases)
-            if (not self._warned_math_snap_miss) and (not self.point_exists(grid_lat, grid_lon)):
+            # Only reachable when no grid centres could be loaded: warn once
+            if not self._warned_math_snap_miss and not self._centres_loading:
                 self._warned_math_snap_miss = True
                 self.dockwidget.info_label.setText(
-                    "Warning: rounded centre point not found in DB for at least one click.\n"
-                    "Consider enabling spatial extension or adding a bbox+distance fallback."
+                    "Warning: the grid-centre list could not be loaded from the DB,\n"
+                    "so clicks use the rounded grid point unchecked."
                 )
 
         self.last_grid_point = (grid_lat, grid_lon)
@@ -454,16 +971,7 @@ class DuckDBClickPlot:
         self.substance = self.dockwidget.current_substance() or self.substance
         self.sector = self.dockwidget.current_sector()
 
-        df = query_timeseries(
-            self.con,
-            lat=grid_lat,
-            lon=grid_lon,
-            substance=self.substance,
-            sector=self.sector,
-            top_sectors=TOP_SECTORS_BY_SUBSTANCE.get(self.substance, []),
-        )
-
-        self._update_plot_and_info(df)
+        self._request_timeseries(grid_lat, grid_lon)
 
     # -------------------------
     # Plot + info formatting
@@ -498,16 +1006,22 @@ class DuckDBClickPlot:
         code = self.sector if self.sector else "TOTALS"
 
         value_txt = "n/a"
-        if df is not None and (not df.empty):
+        if df is not None and len(df) > 0:
             try:
-                last = df.iloc[-1]
-                year = int(last["year"])
-                val = float(last["emission"])
+                years, vals = df["year"], df["emission"]
+                if hasattr(years, "chunks"):
+                    # Arrow column: read the last scalar without concatenating chunks
+                    year, val = years[-1].as_py(), vals[-1].as_py()
+                else:
+                    year, val = years.to_numpy()[-1], vals.to_numpy()[-1]
+                year, val = int(year), float(val)
                 value_txt = f"{val:.6g} {ylabel} (in {year})"
             except Exception:
                 value_txt = "n/a"
 
         self.dockwidget.info_label.setText(
-            f"Clicked (WGS84): {click_lat:.5f}, {click_lon:.5f}\n"
-            f"Substance: {self.substance}, {code}, {value_txt}"
+            self._INFO_TMPL.format(
+                lat=click_lat, lon=click_lon,
+                substance=self.substance, sector=code, value=value_txt,
+            )
         )
@@ -8,7 +8,7 @@ Responsibilities:
 - Display contextual information about the last map click
 - Provide selectors for substance and IPCC sector
 - Render a time-series plot of emissions
-- Allow export of the currently plotted data to CSV
+- Allow export of the currently plotted data (Parquet, Feather, CSV)
 
 This widget deliberately contains *no database logic*.
 All querying and snapping logic lives in the main plugin class.
@@ -20,11 +20,14 @@ Author:
 """
 
 import os
+from importlib.util import find_spec
+
+import numpy as np
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.QtCore import pyqtSignal
+from qgis.PyQt.QtCore import Qt, QTimer, pyqtSignal
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+# Optional: Parquet / Feather export. Imported in export_data when used.
+HAVE_ARROW = find_spec("pyarrow") is not None
 
 
 class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
@@ -33,7 +36,7 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
       - Information panel (location, substance, sector, value)
       - Substance and sector selectors
       - Time-series plot
-      - CSV export
+      - Export (Parquet / Feather / CSV)
 
     Emits a signal when closed so the main plugin can clean up
     (e.g. remove map markers).
@@ -47,10 +50,10 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         self.setWindowTitle("Click Plot")
 
         # -----------------------------
-        # State for CSV export
+        # State for export
         # -----------------------------
-        # Store the most recently plotted DataFrame
-        self._last_df = None
+        # Most recently plotted series as (years int32, emission float64)
+        self._last = None
 
         # Context used to build filenames and annotations for export
         self._ctx = {
@@ -78,6 +81,7 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         # the most recent emission value.
         self.info_label = QtWidgets.QLabel("Click the map…")
         self.info_label.setWordWrap(True)
+        self.info_label.setTextFormat(Qt.PlainText)  # no rich-text detection per update
         self.info_label.setMinimumHeight(40)
         layout.addWidget(self.info_label)
 
@@ -112,7 +116,7 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         self.sector_combo.addItem("All sectors", userData=None)
         sector_col.addWidget(self.sector_combo)
 
-        # ---- CSV export button ----
+        # ---- Export button ----
         # Right-aligned but on the same row to save vertical space
         export_col = QtWidgets.QVBoxLayout()
         export_col.setContentsMargins(0, 0, 0, 0)
@@ -120,8 +124,8 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
 
         # Empty label keeps vertical alignment consistent
         export_col.addWidget(QtWidgets.QLabel(""))
-        self.export_btn = QtWidgets.QPushButton("CSV…")
-        self.export_btn.setToolTip("Export current time series to CSV")
+        self.export_btn = QtWidgets.QPushButton("Export…")
+        self.export_btn.setToolTip("Export current time series (Parquet, Feather or CSV)")
         export_col.addWidget(self.export_btn)
 
         controls.addLayout(substance_col, 1)
@@ -131,18 +135,73 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         layout.addLayout(controls)
 
         # Connect export button
-        self.export_btn.clicked.connect(self.export_csv)
+        self.export_btn.clicked.connect(self.export_data)
 
         # -----------------------------
-        # Matplotlib plot
+        # Plot (pyqtgraph if installed, else matplotlib)
         # -----------------------------
+        self._build_canvas()
+
+        # Rapid updates are coalesced: update_plot stashes its arguments and
+        # the latest ones are drawn once the 50 ms timer fires.
+        self._pending = None  # (title, ylabel) awaiting draw of self._last
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(50)
+        self._redraw_timer.timeout.connect(self._do_draw)
+
+        # Stretch factor ensures plot uses remaining space
+        layout.addWidget(self.canvas, 1)
+
+    def _build_canvas(self):
+        """
+        Create the plot widget as `self.canvas`.
+
+        Uses a pyqtgraph PlotWidget (native Qt drawing, `self.plot_widget`)
+        when pyqtgraph is installed, else a matplotlib figure, axes and
+        canvas (`fig` / `ax` / `canvas`).
+
+        Plotting libraries are imported here rather than at module level,
+        so that loading the plugin at QGIS startup does not pay for them;
+        the cost moves to the first time the dock is opened.
+        """
+        self.plot_widget = None
+        self._curve = None  # pyqtgraph curve; None on the matplotlib path
+
+        try:
+            import pyqtgraph as pg
+        except ImportError:
+            pg = None
+
+        if pg is not None:
+            self.fig = self.ax = None
+            self.plot_widget = pg.PlotWidget(background="w")
+            self.plot_widget.setLabel("bottom", "Year")
+            self._curve = self.plot_widget.plot([], [], pen="b")
+            self.canvas = self.plot_widget
+            return
+
+        try:
+            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        except ImportError:  # matplotlib < 3.5
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
         # Kept intentionally simple: one axis, one line.
         self.fig = Figure(figsize=(5, 3), dpi=100)
         self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel("Year")
         self.canvas = FigureCanvas(self.fig)
 
-        # Stretch factor ensures plot uses remaining space
-        layout.addWidget(self.canvas, 1)
+        # The line is created once and only its data changes
+        (self._line,) = self.ax.plot([], [])
+        self._no_data = self.ax.text(
+            0.5, 0.5, "No data",
+            transform=self.ax.transAxes,
+            ha="center", va="center",
+            visible=False,
+        )
+        self._layout_key = None  # (title, ylabel, empty) of the last draw
 
     def closeEvent(self, event):
         """
@@ -170,8 +229,10 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         """
         self.substance_combo.blockSignals(True)
         self.substance_combo.clear()
-        for s in substances:
-            self.substance_combo.addItem(s, userData=s)
+        substances = list(substances)
+        self.substance_combo.addItems(substances)
+        for i, s in enumerate(substances):
+            self.substance_combo.setItemData(i, s, Qt.UserRole)
         self.substance_combo.blockSignals(False)
 
     def current_substance(self):
@@ -200,13 +261,13 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         self.sector_combo.blockSignals(True)
         self.sector_combo.clear()
 
-        # "All sectors" sentinel
-        self.sector_combo.addItem("All sectors", userData=None)
+        sectors = list(sectors)
+        texts = [f"{c} - {labels[c]}" if labels.get(c) else c for c in sectors]
 
-        for code in sectors:
-            name = labels.get(code, "")
-            text = f"{code} - {name}" if name else code
-            self.sector_combo.addItem(text, userData=code)
+        # "All sectors" sentinel at index 0 keeps its empty (None) itemData
+        self.sector_combo.addItems(["All sectors"] + texts)
+        for i, code in enumerate(sectors, start=1):
+            self.sector_combo.setItemData(i, code, Qt.UserRole)
 
         self.sector_combo.blockSignals(False)
 
@@ -222,7 +283,7 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         return self.sector_combo.currentData()
 
     # ------------------------------------------------------------------
-    # Plot + CSV export
+    # Plot + export
     # ------------------------------------------------------------------
 
     def set_context(self, lat, lon, substance, sector):
@@ -230,7 +291,7 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
         Store the current query context.
 
         This information is used for:
-        - CSV filename generation
+        - Export filename generation
         - Reproducibility (knowing what was plotted)
         """
         self._ctx = {
@@ -242,54 +303,93 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
 
     def update_plot(self, df, title, ylabel=None):
         """
-        Update the matplotlib plot.
+        Update the plot (drawn after a short coalescing delay).
 
         Parameters
         ----------
-        df : pandas.DataFrame
+        df : pyarrow.Table or pandas.DataFrame
             Must contain columns: 'year', 'emission'
         title : str
             Plot title
         ylabel : str, optional
             Y-axis label (typically includes units)
         """
-        self._last_df = df
-        self.ax.clear()
-
-        if df is None or df.empty:
-            # Explicit empty-state handling
-            self.ax.set_title(title)
-            self.ax.set_xlabel("Year")
-            if ylabel:
-                self.ax.set_ylabel(ylabel)
-            self.ax.text(
-                0.5, 0.5, "No data",
-                transform=self.ax.transAxes,
-                ha="center", va="center"
+        # Keep only the two columns, as contiguous arrays. Export state
+        # follows immediately; drawing is deferred and coalesced.
+        if df is None or len(df) == 0:
+            self._last = None
+        else:
+            self._last = (
+                np.ascontiguousarray(df["year"].to_numpy(), dtype=np.int32),
+                np.ascontiguousarray(df["emission"].to_numpy(), dtype=np.float64),
             )
-            self.canvas.draw()
+        self._pending = (title, ylabel)
+        self._redraw_timer.start()
+
+    def _do_draw(self):
+        """Draw the most recent update_plot() arguments (redraw timer slot)."""
+        if self._pending is None:
             return
+        title, ylabel = self._pending
+        self._pending = None
 
-        # Standard time-series plot
-        self.ax.plot(df["year"], df["emission"])
-        self.ax.set_title(title)
-        self.ax.set_xlabel("Year")
-        if ylabel:
-            self.ax.set_ylabel(ylabel)
+        empty = self._last is None or self._last[0].size == 0
+        if empty:
+            x, y = [], []
+        else:
+            # Plotted as stored: the plot libraries convert to float64
+            # anyway, so downcasting here would only add copies.
+            x, y = self._last
+
+        if self._curve is not None:
+            # pyqtgraph: update the curve in place, Qt repaints as needed
+            self._curve.setData(x, y)
+            self.plot_widget.setTitle(f"{title} (no data)" if empty else title)
+            self.plot_widget.setLabel("left", ylabel or "")
+            return
+
+        # Nothing visible changed (e.g. same series re-delivered): skip drawing
+        old_x, old_y = self._line.get_data()
+        layout_key = (title, ylabel, empty)
+        if (
+            layout_key == self._layout_key
+            and np.array_equal(old_x, x)
+            and np.array_equal(old_y, y)
+        ):
+            return
+
+        self._line.set_data(x, y)
+        if empty:
+            # Same neutral axes as a freshly cleared plot
+            self.ax.set_xlim(0, 1)
+            self.ax.set_ylim(0, 1)
+        else:
+            self.ax.relim()
+            self.ax.autoscale(True)
+            self.ax.autoscale_view()
 
-        self.fig.tight_layout()
+        self.ax.set_title(title)
+        self.ax.set_ylabel(ylabel or "")
+        self._no_data.set_visible(empty)
+        if not empty:
+            self.fig.tight_layout()
+        self._layout_key = layout_key
         self.canvas.draw()
 
-    def export_csv(self):
+    def export_data(self):
         """
-        Export the currently plotted time series to CSV.
+        Export the currently plotted time series to Parquet, Feather or CSV.
+
+        The format follows the chosen file suffix. Parquet (zstd) and
+        Feather are columnar and much smaller/faster than CSV; they need
+        pyarrow, so only CSV is offered without it.
 
         The exported file contains exactly the data shown
         in the plot — no additional aggregation or filtering.
         """
-        if self._last_df is None or self._last_df.empty:
+        if self._last is None or self._last[0].size == 0:
             QtWidgets.QMessageBox.information(
-                self, "Export CSV", "No data to export yet."
+                self, "Export", "No data to export yet."
             )
             return
 
@@ -302,31 +402,69 @@ class DuckDBClickPlotDockWidget(QtWidgets.QDockWidget):
             """Make strings filesystem-safe."""
             return str(x).replace(" ", "_").replace("/", "_")
 
+        ext = ".parquet" if HAVE_ARROW else ".csv"
         if lat is None or lon is None:
-            default_name = f"{safe(substance)}_{safe(sector)}.csv"
+            default_name = f"{safe(substance)}_{safe(sector)}{ext}"
         else:
             default_name = (
-                f"{safe(substance)}_{safe(sector)}_{lat:.2f}_{lon:.2f}.csv"
+                f"{safe(substance)}_{safe(sector)}_{lat:.2f}_{lon:.2f}{ext}"
             )
 
+        if HAVE_ARROW:
+            filters = "Parquet (*.parquet);;Feather (*.feather);;CSV (*.csv)"
+        else:
+            filters = "CSV (*.csv)"
+
         start_dir = os.path.expanduser("~")
         path, _ = QtWidgets.QFileDialog.getSaveFileName(
             self,
-            "Export time series to CSV",
+            "Export time series",
             os.path.join(start_dir, default_name),
-            "CSV (*.csv)"
+            filters
         )
         if not path:
             return
 
+        years, vals = self._last
+        suffix = os.path.splitext(path)[1].lower()
+
         try:
-            self._last_df.to_csv(path, index=False)
+            if HAVE_ARROW and suffix == ".parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pa_parquet
+
+                tbl = pa.table({"year": years, "emission": vals})
+                pa_parquet.write_table(tbl, path, compression="zstd")
+            elif HAVE_ARROW and suffix == ".feather":
+                import pyarrow as pa
+                import pyarrow.feather as pa_feather
+
+                tbl = pa.table({"year": years, "emission": vals})
+                pa_feather.write_feather(tbl, path)
+            else:
+                self._write_csv(path, years, vals)
         except Exception as e:
             QtWidgets.QMessageBox.critical(
-                self, "Export CSV", f"Failed to write CSV:\n{e}"
+                self, "Export", f"Failed to write file:\n{e}"
             )
             return
 
         QtWidgets.QMessageBox.information(
-            self, "Export CSV", f"Wrote:\n{path}"
+            self, "Export", f"Wrote:\n{path}"
         )
+
+    @staticmethod
+    def _write_csv(path, years, vals):
+        """
+        Write year,emission CSV directly from two arrays.
+
+        Two small columns: format directly rather than via a CSV engine.
+        repr() is the shortest exact float text; NaN is written empty.
+        """
+        lines = ["year,emission"]
+        lines += [
+            f"{int(y)},{'' if v != v else repr(float(v))}"
+            for y, v in zip(years.tolist(), vals.tolist())
+        ]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("\n".join(lines) + "\n")
@@ -34,7 +34,141 @@ Tables assumed:
     )
 """
 
-def find_nearest_point(con, lon, lat):
+import math
+from importlib.util import find_spec
+
+# ---------------------------------------------------------------------
+# Hard-coded top sectors per substance (KISS / reproducible)
+# ---------------------------------------------------------------------
+# Kept here, free of QGIS imports, so build scripts can use the same
+# "All sectors" fallback lists as the plugin.
+
+TOP_SECTORS_BY_SUBSTANCE = {
+    "CH4": ["ENF", "PRO_FFF", "PRO_COAL", "MNM", "SWD_LDF", "PRO_GAS", "WWT", "PRO_OIL"],
+    "CO2": ["ENE", "TRO", "IND", "REF_TRF", "RCO", "NMM", "TNR_Aviation_CRS", "TNR_Other"],
+    "CO2bio": ["IND", "AWB", "ENE", "PRO_FFF", "TRO", "SWD_INC", "TNR_Aviation_CRS", "TNR_Aviation_CDS"],
+    "N2O": ["AGS", "IDE", "N2O", "CHE", "ENE", "RCO", "REF_TRF", "IND"],
+}
+
+
+# Timeseries SQL shared by query_timeseries (ad hoc) and PreparedQueries
+# (PREPARE ... AS). Positional $n parameters work in both.
+SQL_TS_TOTALS = """
+SELECT year, SUM(emission) AS emission
+FROM emissions
+WHERE lat = $1 AND lon = $2
+  AND substance = $3
+  AND sector = 'TOTALS'
+GROUP BY year
+ORDER BY year
+"""
+
+SQL_TS_SECTOR = """
+SELECT year, SUM(emission) AS emission
+FROM emissions
+WHERE lat = $1 AND lon = $2
+  AND substance = $3
+  AND sector = $4
+GROUP BY year
+ORDER BY year
+"""
+
+# Same two statements keyed on the precomputed cell id (see `create_cell_ids`):
+# $1 = cell_id(lat, lon), so the remaining parameters shift down by one.
+SQL_TS_TOTALS_BY_CELL = """
+SELECT year, SUM(emission) AS emission
+FROM emissions
+WHERE cell_id = $1
+  AND substance = $2
+  AND sector = 'TOTALS'
+GROUP BY year
+ORDER BY year
+"""
+
+SQL_TS_SECTOR_BY_CELL = """
+SELECT year, SUM(emission) AS emission
+FROM emissions
+WHERE cell_id = $1
+  AND substance = $2
+  AND sector = $3
+GROUP BY year
+ORDER BY year
+"""
+
+SQL_TS_ALL = """
+SELECT year, emission
+FROM emissions_totals
+WHERE lat = $1 AND lon = $2
+  AND substance = $3
+ORDER BY year
+"""
+
+SQL_TOP_SECTORS = """
+SELECT sector
+FROM emissions
+WHERE substance = $1
+  AND sector != 'TOTALS'
+GROUP BY sector
+HAVING SUM(emission) > 0
+ORDER BY SUM(emission) DESC
+LIMIT $2
+"""
+
+# $1 = lon, $2 = lat, $3 = search half-width (degrees)
+SQL_NEAREST = """
+SELECT lat, lon
+FROM emissions
+WHERE lat BETWEEN $2 - $3 AND $2 + $3
+  AND lon BETWEEN $1 - $3 AND $1 + $3
+  AND ST_Intersects(location, ST_MakeEnvelope($1 - $3, $2 - $3, $1 + $3, $2 + $3))
+ORDER BY ST_Distance(location, ST_Point($1, $2))
+LIMIT 1
+"""
+
+# Integer id of the 0.1° cell containing (lat, lon): cells are counted from
+# (-90, -180), 3600 per latitude row. See `cell_id` for the Python side.
+SQL_CELL_ID = "floor((lat + 90) * 10)::INTEGER * 3600 + floor((lon + 180) * 10)::INTEGER"
+
+# Fixed arity of the generic "All sectors" prepared statement; shorter
+# sector lists are padded with NULL, which never matches `sector IN (...)`.
+MAX_TOP_SECTORS = 8
+
+# Optional: enables Arrow result fetching. Only probed here; DuckDB imports
+# pyarrow itself on the first Arrow fetch.
+HAVE_ARROW = find_spec("pyarrow") is not None
+
+
+def _fetch_table(result):
+    """
+    Materialise a query result as a columnar table.
+
+    Returns a pyarrow.Table when pyarrow is installed (columnar buffers,
+    no pandas block consolidation), else a pandas.DataFrame. Both support
+    `len(t)` and `t["col"].to_numpy()`, which is all callers rely on.
+
+    The small per-cell results arrive as a single chunk without nulls,
+    so `to_numpy()` on an Arrow column is a zero-copy view of DuckDB's
+    buffer; no pandas conversion happens on the plot path.
+    """
+    if HAVE_ARROW:
+        if hasattr(result, "to_arrow_table"):  # fetch_arrow_table() is deprecated
+            return result.to_arrow_table()
+        return result.fetch_arrow_table()
+    return result.fetchdf()
+
+
+def cell_id(lat, lon):
+    """
+    Integer cell id of a point, identical to `SQL_CELL_ID`.
+
+    Uses floor (not rounding) on the same double arithmetic as DuckDB, so
+    a stored centre and the id computed here always agree. Centres sit
+    mid-cell, far from any floor boundary.
+    """
+    return math.floor((lat + 90) * 10) * 3600 + math.floor((lon + 180) * 10)
+
+
+def find_nearest_point(con, lon, lat, radius=0.15):
     """
     Find the nearest grid-cell centre to an arbitrary point.
 
@@ -49,26 +183,57 @@ def find_nearest_point(con, lon, lat):
         Longitude in degrees (WGS84).
     lat : float
         Latitude in degrees (WGS84).
+    radius : float, optional
+        Half-width (degrees) of the search box around the point
+        (default: 0.15, i.e. 1.5 grid cells).
 
     Returns
     -------
-    (lat, lon) : tuple of float
-        Latitude and longitude of the nearest grid-cell centre.
+    (lat, lon) : tuple of float, or None
+        Latitude and longitude of the nearest grid-cell centre,
+        or None if no centre lies within `radius` of the point.
 
     Notes
     -----
     - This is used only for snapping the user’s click to the grid.
-    - Performance is acceptable because the grid is coarse (0.1°).
+    - Candidates are first restricted to a lat/lon box with plain range
+      predicates (pruned by zone maps, no spatial index needed), and
+      with ST_Intersects against the same constant envelope, which
+      DuckDB's RTREE index can answer when `emissions_rtree` exists
+      (see `create_indexes`). Only a handful of rows reach ST_Distance.
     - A deterministic mathematical fallback exists in the main plugin
       if the spatial extension is unavailable.
     """
+    return con.execute(SQL_NEAREST, [lon, lat, radius]).fetchone()
+
+
+def load_grid_centres(con):
+    """
+    Return every distinct grid-cell centre in the table.
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        Open DuckDB connection.
+
+    Returns
+    -------
+    (lat, lon) : tuple of numpy.ndarray
+        Two parallel float64 arrays, one entry per grid cell,
+        exactly as stored.
+
+    Notes
+    -----
+    - Intended to be called once per connection; the plugin keeps the
+      result in memory so that click snapping needs no SQL.
+    - For a regional 0.1° grid this is tens of thousands of rows.
+    """
     sql = """
-    SELECT lat, lon
-    FROM emissions
-    ORDER BY ST_Distance(location, ST_Point(?, ?))
-    LIMIT 1;
+    SELECT DISTINCT lat, lon
+    FROM emissions;
     """
-    return con.execute(sql, [lon, lat]).fetchone()
+    cols = con.execute(sql).fetchnumpy()
+    return cols["lat"], cols["lon"]
 
 
 def top_sectors_for_substance(con, substance, limit=8):
@@ -101,21 +266,12 @@ def top_sectors_for_substance(con, substance, limit=8):
     - Sectors with zero total emissions are excluded.
     - Ranking is based on *global* totals for the substance, not per-cell.
     """
-    sql = """
-    SELECT sector
-    FROM emissions
-    WHERE substance = ?
-      AND sector != 'TOTALS'
-    GROUP BY sector
-    HAVING SUM(emission) > 0
-    ORDER BY SUM(emission) DESC
-    LIMIT ?;
-    """
-    rows = con.execute(sql, [substance, limit]).fetchall()
+    rows = con.execute(SQL_TOP_SECTORS, [substance, limit]).fetchall()
     return [r[0] for r in rows]
 
 
-def query_timeseries(con, lat, lon, substance="CH4", sector=None, top_sectors=None):
+def query_timeseries(con, lat, lon, substance="CH4", sector=None, top_sectors=None,
+                     totals_table=False):
     """
     Query a yearly emissions time series for a single grid cell.
 
@@ -135,10 +291,14 @@ def query_timeseries(con, lat, lon, substance="CH4", sector=None, top_sectors=No
     top_sectors : list of str or None, optional
         List of sector codes used as a fallback aggregation set
         when TOTALS is not available.
+    totals_table : bool, optional
+        If True, answer "All sectors" from the precomputed
+        `emissions_totals` table (see `create_totals_table`),
+        which encodes the same semantics (default: False).
 
     Returns
     -------
-    pandas.DataFrame
+    pyarrow.Table (pandas.DataFrame if pyarrow is not installed)
         Columns:
             - year (int)
             - emission (float)
@@ -166,48 +326,383 @@ def query_timeseries(con, lat, lon, substance="CH4", sector=None, top_sectors=No
     - This behaviour is explicit and auditable.
     """
 
+    if sector is None and totals_table:
+        # ---- Case 1 (precomputed): "All sectors" lookup ----
+        return _fetch_table(con.execute(SQL_TS_ALL, [lat, lon, substance]))
+
     if sector is None:
         # ---- Case 1: "All sectors" ----
-        # Prefer TOTALS when present (avoids double counting)
-        sql_totals = """
-        SELECT year, SUM(emission) AS emission
+        if not top_sectors:
+            # TOTALS only (empty result if the cell has none)
+            return _fetch_table(con.execute(SQL_TS_TOTALS, [lat, lon, substance]))
+
+        # TOTALS when present, else sum of the dominant sectors, in one statement
+        placeholders = ", ".join(f"${i}" for i in range(4, 4 + len(top_sectors)))
+        sql = _all_sectors_sql("$3", placeholders)
+        params = [lat, lon, substance] + list(top_sectors)
+        return _fetch_table(con.execute(sql, params))
+
+    # ---- Case 2: Specific sector ----
+    return _fetch_table(con.execute(SQL_TS_SECTOR, [lat, lon, substance, sector]))
+
+
+def _all_sectors_sql(substance, sectors, cell="lat = $1 AND lon = $2"):
+    """
+    "All sectors" SQL: TOTALS if the cell has any, else the top-sector sum.
+
+    `substance` and `sectors` are SQL fragments (a parameter or literal,
+    and a comma-separated list); `cell` is the predicate selecting the
+    cell, by default on lat/lon as $1/$2. Both candidate series
+    come from a single scan of the cell: each year's TOTALS and fallback
+    sums are aggregated side by side, and a window over all years picks
+    which one the cell reports, matching the two-query semantics exactly.
+    """
+    return f"""
+    WITH per_year AS (
+        SELECT year,
+               SUM(emission) FILTER (WHERE sector = 'TOTALS') AS totals,
+               COUNT(*) FILTER (WHERE sector = 'TOTALS') AS n_totals,
+               SUM(emission) FILTER (WHERE sector IN ({sectors})) AS fallback,
+               COUNT(*) FILTER (WHERE sector IN ({sectors})) AS n_fallback
         FROM emissions
-        WHERE lat = ? AND lon = ?
-          AND substance = ?
-          AND sector = 'TOTALS'
+        WHERE {cell}
+          AND substance = {substance}
+          AND (sector = 'TOTALS' OR sector IN ({sectors}))
         GROUP BY year
-        ORDER BY year;
+    ),
+    picked AS (
+        SELECT *, SUM(n_totals) OVER () > 0 AS has_totals
+        FROM per_year
+    )
+    SELECT year,
+           CASE WHEN has_totals THEN totals ELSE fallback END AS emission
+    FROM picked
+    WHERE CASE WHEN has_totals THEN n_totals > 0 ELSE n_fallback > 0 END
+    ORDER BY year
+    """
+
+
+def _sql_literal(value):
+    """
+    Render a Python value as a SQL literal.
+
+    EXECUTE does not accept bind parameters, so prepared-statement
+    arguments are inlined. Doubles go through a string cast, which
+    round-trips `repr(float)` exactly (a bare decimal literal would be
+    parsed as DECIMAL first).
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, int):
+        return str(value)
+    return f"CAST('{float(value)!r}' AS DOUBLE)"
+
+
+class PreparedQueries:
+    """
+    Prepared statements for the per-click hot path.
+
+    DuckDB prepared statements belong to the connection (or cursor) that
+    created them, so one instance is bound to one cursor. A cursor is not
+    safe for concurrent use: the instance may be built on one thread and
+    then used on another (the plugin builds it on the UI thread and runs
+    it on its single worker thread), but never from two at once.
+
+    The Python API has no prepare(); statements are created with SQL
+    `PREPARE name AS ...` and run with `EXECUTE name(...)`, which skips
+    re-planning on every click.
+
+    Every statement is prepared once, in the constructor. The generic
+    "All sectors" statement takes a fixed `MAX_TOP_SECTORS` sector
+    parameters, NULL-padded, so any short sector list reuses one plan.
+    If `top_sectors_by_substance` is given (and `emissions_totals` is
+    absent), the "All sectors" statement is also prepared per substance,
+    with that substance and its sector list inlined as constants so the
+    IN-list is folded into a single set filter at plan time.
+
+    With `use_cell_ids=True`, and if `emissions` has a fully populated
+    integer `cell_id` column (see `create_cell_ids`), the statements on
+    that table select the cell by one integer equality instead of two
+    DOUBLE comparisons. Off by default: the column is built outside the
+    plugin and must be recomputed whenever the data changes.
+
+    The nearest-point fallback lives in `NearestQuery`, which prepares
+    nothing else.
+    """
+
+    def __init__(self, con, top_sectors_by_substance=None, use_cell_ids=False):
+        self.con = con
+
+        # Statements on `emissions` select the cell by lat/lon ($1, $2) or,
+        # with cell ids, by `cell_id = $1`; their other parameters follow.
+        self.cell_ids = use_cell_ids and _cell_ids_complete(con)
+        if self.cell_ids:
+            cell, first = "cell_id = $1", 2
+            statements = {"ts_totals": SQL_TS_TOTALS_BY_CELL, "ts_sector": SQL_TS_SECTOR_BY_CELL}
+        else:
+            cell, first = "lat = $1 AND lon = $2", 3
+            statements = {"ts_totals": SQL_TS_TOTALS, "ts_sector": SQL_TS_SECTOR}
+        statements["ts_top"] = _all_sectors_sql(
+            f"${first}",
+            ", ".join(f"${i}" for i in range(first + 1, first + 1 + MAX_TOP_SECTORS)),
+            cell,
+        )
+
+        # Use the precomputed "All sectors" table when it has been built
+        self.totals_table = has_table(con, "emissions_totals")
+        if self.totals_table:
+            statements["ts_all"] = SQL_TS_ALL
+
+        # (substance, tuple(top_sectors)) -> specialised "All sectors" statement
+        self._all_stmts = {}
+        if not self.totals_table and top_sectors_by_substance:
+            for i, (substance, sectors) in enumerate(top_sectors_by_substance.items()):
+                if not sectors:
+                    continue
+                name = f"ts_all_{i}"
+                statements[name] = _all_sectors_sql(
+                    _sql_literal(substance),
+                    ", ".join(_sql_literal(sec) for sec in sectors),
+                    cell,
+                )
+                self._all_stmts[(substance, tuple(sectors))] = name
+
+        # Statements whose (lat, lon) arguments are passed as one cell id
+        self._by_cell = set()
+        if self.cell_ids:
+            self._by_cell = {"ts_totals", "ts_sector", "ts_top"} | set(self._all_stmts.values())
+
+        for name, sql in statements.items():
+            con.execute(f"PREPARE {name} AS {sql}")
+
+    def _execute(self, name, params):
+        if name in self._by_cell:
+            params = [cell_id(params[0], params[1])] + list(params[2:])
+        args = ", ".join(_sql_literal(p) for p in params)
+        return _fetch_table(self.con.execute(f"EXECUTE {name}({args});"))
+
+    def timeseries(self, lat, lon, substance="CH4", sector=None, top_sectors=None):
         """
-        df = con.execute(sql_totals, [lat, lon, substance]).fetchdf()
-        if df is not None and not df.empty:
-            return df
-
-        # Fallback: sum dominant sectors only (explicit, bounded set)
-        if top_sectors:
-            placeholders = ",".join(["?"] * len(top_sectors))
-            sql_fallback = f"""
-            SELECT year, SUM(emission) AS emission
-            FROM emissions
-            WHERE lat = ? AND lon = ?
-              AND substance = ?
-              AND sector IN ({placeholders})
-            GROUP BY year
-            ORDER BY year;
-            """
-            params = [lat, lon, substance] + list(top_sectors)
-            return con.execute(sql_fallback, params).fetchdf()
-
-        # No TOTALS and no fallback sectors: return empty result
-        return df
+        Prepared-statement equivalent of `query_timeseries`.
 
-    # ---- Case 2: Specific sector ----
-    sql_sector = """
-    SELECT year, SUM(emission) AS emission
-    FROM emissions
-    WHERE lat = ? AND lon = ?
-      AND substance = ?
-      AND sector = ?
-    GROUP BY year
-    ORDER BY year;
-    """
-    return con.execute(sql_sector, [lat, lon, substance, sector]).fetchdf()
+        Same parameters, return type and aggregation semantics; the
+        `emissions_totals` table is used automatically if present. A
+        `top_sectors` list without a specialised statement uses the
+        NULL-padded generic one, or runs ad hoc if it is longer than
+        `MAX_TOP_SECTORS`.
+        """
+        if sector is not None:
+            return self._execute("ts_sector", [lat, lon, substance, sector])
+
+        if self.totals_table:
+            return self._execute("ts_all", [lat, lon, substance])
+
+        if not top_sectors:
+            return self._execute("ts_totals", [lat, lon, substance])
+
+        name = self._all_stmts.get((substance, tuple(top_sectors)))
+        if name is not None:
+            return self._execute(name, [lat, lon])
+        if len(top_sectors) <= MAX_TOP_SECTORS:
+            padding = [None] * (MAX_TOP_SECTORS - len(top_sectors))
+            return self._execute("ts_top", [lat, lon, substance] + list(top_sectors) + padding)
+        return query_timeseries(self.con, lat, lon, substance, None, top_sectors)
+
+
+class NearestQuery:
+    """
+    Prepared nearest-point statement, the spatial fallback of the click snap.
+
+    Kept apart from `PreparedQueries` so a connection that only needs this
+    lookup does not prepare the timeseries statements. Same threading rule:
+    bound to one connection, never used from two threads at once.
+
+    The statement needs the spatial extension, which may be loaded after
+    construction, so it is prepared on first use.
+    """
+
+    def __init__(self, con):
+        self.con = con
+        self._prepared = False
+
+    def nearest(self, lon, lat, radius=0.15):
+        """
+        Prepared-statement equivalent of `find_nearest_point`.
+
+        The spatial extension must be loaded on this connection.
+        """
+        if not self._prepared:
+            self.con.execute(f"PREPARE nearest AS {SQL_NEAREST}")
+            self._prepared = True
+        args = ", ".join(_sql_literal(p) for p in (lon, lat, radius))
+        return self.con.execute(f"EXECUTE nearest({args});").fetchone()
+
+
+def create_indexes(con, spatial=True):
+    """
+    Create the optional RTREE index for the spatial nearest-point query.
+
+    This is a one-off, write-mode step for a build script; the plugin
+    never runs it. It only helps `find_nearest_point`, which the plugin
+    uses solely when the grid-centre list could not be loaded.
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        Read-write DuckDB connection.
+    spatial : bool, optional
+        Whether the spatial extension is loaded on `con`. The RTREE
+        index is only created when True (default: True).
+
+    Notes
+    -----
+    - No ART indexes are built on the key columns: DuckDB only uses an
+      ART index for lookups on a single-column equality, so composite
+      (lat, lon, substance, ...) indexes would never be probed.
+    - `emissions_rtree` is an RTREE index on the `location` geometry.
+      It is used by `find_nearest_point` via its ST_Intersects prefilter.
+    - `IF NOT EXISTS` makes repeated calls cheap no-ops.
+    - Indexes do not change any stored values.
+    """
+    if spatial:
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS emissions_rtree ON emissions USING RTREE (location);"
+        )
+
+
+def create_cell_ids(con):
+    """
+    Add (or recompute) the integer `cell_id` column of `emissions`.
+
+    Ingest/build step for a script with a read-write connection; the
+    plugin never runs it. The column is `SQL_CELL_ID`, computed from the
+    stored lat/lon; other columns are left untouched. Re-run it after
+    any change to `emissions` (appended, reloaded or edited rows), or
+    the cell-id lookups will miss those rows.
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        Read-write DuckDB connection.
+
+    Notes
+    -----
+    - Column add and fill run in one transaction, so an interrupted
+      build never leaves a half-filled column behind.
+    - The plugin only uses the column when enabled explicitly, and
+      ignores it while any row has a NULL `cell_id`.
+    """
+    con.execute("BEGIN TRANSACTION;")
+    try:
+        if not has_column(con, "emissions", "cell_id"):
+            con.execute("ALTER TABLE emissions ADD COLUMN cell_id INTEGER;")
+        con.execute(f"UPDATE emissions SET cell_id = {SQL_CELL_ID};")
+        con.execute("COMMIT;")
+    except Exception:
+        con.execute("ROLLBACK;")
+        raise
+
+
+def _cell_ids_complete(con):
+    """True if `emissions.cell_id` exists and no row is missing its value."""
+    if not has_column(con, "emissions", "cell_id"):
+        return False
+    row = con.execute(
+        "SELECT 1 FROM emissions WHERE cell_id IS NULL LIMIT 1;"
+    ).fetchone()
+    return row is None
+
+
+def create_totals_table(con, top_sectors_by_substance):
+    """
+    Materialise the "All sectors" series for every cell into `emissions_totals`.
+
+    One-off, write-mode step (see `create_indexes`). Afterwards the
+    "All sectors" query is a direct lookup instead of a per-click
+    aggregation over up to eight sector rows per year.
+
+    Parameters
+    ----------
+    con : duckdb.DuckDBPyConnection
+        Read-write DuckDB connection.
+    top_sectors_by_substance : dict[str, list[str]]
+        Fallback sector list per substance, as used by `query_timeseries`.
+
+    Notes
+    -----
+    - Encodes exactly the `query_timeseries` semantics: TOTALS where a
+      (lat, lon, substance) has it, else the sum over the top sectors.
+    - Built with `IF NOT EXISTS`: if the source data or the top-sector
+      lists change, drop the table so it is rebuilt.
+    """
+    pairs = [
+        f"({_sql_literal(sub)}, {_sql_literal(sec)})"
+        for sub, sectors in top_sectors_by_substance.items()
+        for sec in sectors
+    ]
+    if not pairs:
+        return
+
+    sql = f"""
+    CREATE TABLE IF NOT EXISTS emissions_totals AS
+    WITH top_sectors(substance, sector) AS (
+        VALUES {", ".join(pairs)}
+    ),
+    totals AS (
+        SELECT lat, lon, substance, year, SUM(emission) AS emission
+        FROM emissions
+        WHERE sector = 'TOTALS'
+        GROUP BY lat, lon, substance, year
+    ),
+    fallback AS (
+        SELECT e.lat, e.lon, e.substance, e.year, SUM(e.emission) AS emission
+        FROM emissions e
+        JOIN top_sectors t
+          ON e.substance = t.substance AND e.sector = t.sector
+        GROUP BY e.lat, e.lon, e.substance, e.year
+    )
+    SELECT * FROM totals
+    UNION ALL
+    SELECT f.* FROM fallback f
+    WHERE NOT EXISTS (
+        SELECT 1 FROM totals t
+        WHERE t.lat = f.lat AND t.lon = f.lon AND t.substance = f.substance
+    );
+    """
+    con.execute(sql)
+
+
+# Objects created by create_totals_table
+DERIVED_TABLES = ("emissions_totals",)
+
+
+def missing_derived_objects(con):
+    """
+    Return the names of derived tables not yet present.
+
+    Works on a read-only connection, so callers can decide whether a
+    read-write preparation step is needed at all.
+    """
+    missing = [t for t in DERIVED_TABLES if not has_table(con, t)]
+    return missing
+
+
+def has_table(con, name):
+    """Return True if a table (or view) called `name` exists."""
+    row = con.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_name = ? LIMIT 1;",
+        [name],
+    ).fetchone()
+    return row is not None
+
+
+def has_column(con, table, column):
+    """Return True if `table` has a column called `column`."""
+    row = con.execute(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = ? AND column_name = ? LIMIT 1;",
+        [table, column],
+    ).fetchone()
+    return row is not None
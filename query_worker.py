@@ -0,0 +1,32 @@
+from qgis.PyQt.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class QueryWorkerSignals(QObject):
+    finished = pyqtSignal(int, object)  # (sequence number, query result)
+    failed = pyqtSignal(int, str)  # (sequence number, error message)
+
+
+class QueryWorker(QRunnable):
+    """Run a blocking query callable on a QThreadPool thread.
+
+    The result is delivered via `signals.finished` together with the
+    caller-supplied sequence number, so the receiver can drop results
+    that were superseded while the query was running. If the callable
+    raises, `signals.failed` carries the error message instead, so a
+    failed query is never mistaken for an empty result.
+    """
+
+    def __init__(self, seq, fn, *args):
+        super().__init__()
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.signals = QueryWorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.seq, str(e) or type(e).__name__)
+            return
+        self.signals.finished.emit(self.seq, result)